@@ -1,15 +1,24 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import mmap
 import os
+import re
+import shutil
+import signal
+import stat
 import subprocess
 import sys
+import threading
 import time
 from abc import ABC, abstractmethod
 from argparse import Namespace
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 from xml.etree import ElementTree
 
 BOLD_RED = "\033[1;31m"
@@ -25,6 +34,23 @@ SKIPPED = f"{BOLD_YELLOW}SKIPPED{ENDC}"
 RUNNING = f"   {BOLD_GREEN}RUNNING{ENDC}"
 ERROR = f"{RED}error{ENDC}"
 
+UI_TRANSLATABLE_PATTERN = re.compile(rb'translatable="yes"')
+RUST_GETTEXT_PATTERN = re.compile(rb"gettext!?\(")
+CARGO_EDITION_PATTERN = re.compile(r'^edition\s*=\s*"(\d+)"', re.MULTILINE)
+
+_ENV = os.environ.copy()
+
+# Processes get their own process group, so that their children can be
+# terminated too. Unlike a new session, they still share the terminal.
+if sys.version_info >= (3, 11):
+    _PROCESS_GROUP_ARGS: Dict[str, Any] = {"process_group": 0}
+else:
+    _PROCESS_GROUP_ARGS = {"preexec_fn": os.setpgrp}
+
+_running_processes: Set[subprocess.Popen[str]] = set()
+_running_processes_lock = threading.Lock()
+_abort_event = threading.Event()
+
 
 class CheckError(Exception, ABC):
     @abstractmethod
@@ -84,72 +110,139 @@ class Check(ABC):
 
 
 class Rustfmt(Check):
-    """Run rustfmt to enforce code style."""
+    """Run rustfmt to enforce code style.
+
+    If `files` is given, only those files are checked instead of the whole crate.
+
+    With `stop_at_first_diff`, cargo fmt is terminated as soon as the first
+    diff is complete, and only that diff is reported.
+    """
+
+    def __init__(
+        self, files: Optional[List[Path]] = None, stop_at_first_diff: bool = False
+    ):
+        self._files = files
+        self._stop_at_first_diff = stop_at_first_diff
 
     def version(self):
-        try:
-            return get_output(["cargo", "fmt", "--version"])
-        except FileNotFoundError:
-            return None
+        return self._version
 
     def subject(self):
         return "code style"
 
     def run(self):
-        try:
-            return_code, output = run_and_get_output(
-                ["cargo", "fmt", "--all", "--", "--check"]
-            )
-        except FileNotFoundError:
+        lines: List[str] = []
+        has_diff = False
+
+        if self._files is None:
+            args = ["cargo", "fmt", "--all", "--", "--check"]
+        else:
+            # cargo fmt always formats the whole crate, so call rustfmt directly
+            args = [
+                "rustfmt",
+                "--check",
+                *self._get_edition_args(),
+                *map(str, self._files),
+            ]
+
+        if shutil.which(args[0]) is None:
             raise MissingDependencyError(
-                "cargo fmt", install_command="rustup component add rustfmt"
+                args[0], install_command="rustup component add rustfmt"
             )
 
+        with spawn(args, stderr=subprocess.STDOUT) as process:
+            assert process.stdout is not None
+
+            for line in process.stdout:
+                # Every diff hunk starts with a `Diff in <file>` line
+                if line.startswith("Diff in"):
+                    if has_diff and self._stop_at_first_diff:
+                        process.terminate()
+                        break
+
+                    has_diff = True
+
+                lines.append(line)
+
+            return_code = process.wait()
+
         if return_code != 0:
             raise FailedCheckError(
-                error_message=output,
+                error_message="".join(lines).strip(),
                 suggestion_message="Try running `cargo fmt --all`",
             )
 
+    @staticmethod
+    def _get_edition_args() -> List[str]:
+        """Returns the rustfmt arguments for the edition set in Cargo.toml.
 
-class Typos(Check):
-    """Run typos to check for spelling mistakes."""
+        rustfmt only knows the edition when it is run through cargo fmt.
+        """
 
-    def version(self):
-        try:
-            return_code, output = self._run_typos(["--version"])
+        with open("Cargo.toml") as cargo_toml:
+            match = CARGO_EDITION_PATTERN.search(cargo_toml.read())
 
-            if return_code != 0:
-                return None
+        return ["--edition", match.group(1)] if match else []
 
-            return output
+    @cached_property
+    def _version(self) -> Optional[str]:
+        try:
+            return get_output(["cargo", "fmt", "--version"])
         except FileNotFoundError:
             return None
 
+
+class Typos(Check):
+    """Run typos to check for spelling mistakes.
+
+    If `files` is given, only those files are checked instead of the whole project.
+    """
+
+    def __init__(self, files: Optional[List[Path]] = None):
+        self._files = files
+
+    def version(self):
+        return self._version
+
     def subject(self):
         return "spelling mistakes"
 
     def run(self):
-        try:
-            return_code, output = self._run_typos(["--color", "always"])
-        except FileNotFoundError:
+        if self._executable is None:
             raise MissingDependencyError(
                 "typos", install_command="cargo install typos-cli"
             )
 
+        args = ["--color", "always"]
+
+        if self._files is not None:
+            args += ["--force-exclude", *map(str, self._files)]
+
+        return_code, output = run_and_get_output([self._executable, *args])
+
         if return_code != 0:
             raise FailedCheckError(
                 error_message=output,
                 suggestion_message="Try running `typos -w`",
             )
 
-    @staticmethod
-    def _run_typos(args: List[str]) -> Tuple[int, str]:
-        try:
-            return run_and_get_output(["typos", *args])
-        except FileNotFoundError:
-            typos_full_path = os.path.expanduser("~/.cargo/bin/typos")
-            return run_and_get_output([typos_full_path, *args])
+    @cached_property
+    def _executable(self) -> Optional[str]:
+        return shutil.which("typos") or shutil.which(
+            os.path.expanduser("~/.cargo/bin/typos")
+        )
+
+    @cached_property
+    def _version(self) -> Optional[str]:
+        if self._executable is None:
+            return None
+
+        return_code, output = run_and_get_output([self._executable, "--version"])
+
+        if return_code != 0:
+            return None
+
+        return output
 
 
 class PotfilesAlphabetically(Check):
@@ -168,17 +261,17 @@ class PotfilesAlphabetically(Check):
     def run(self):
         files = self._get_files()
 
-        for file, sorted_file in zip(files, sorted(files)):
-            if file != sorted_file:
+        for file, next_file in zip(files, files[1:]):
+            if file > next_file:
                 raise FailedCheckError(
-                    error_message=f"{ERROR}: Found file `{file}` before `{sorted_file}` in POTFILES.in",
+                    error_message=f"{ERROR}: Found file `{file}` before `{next_file}` in POTFILES.in",
                     suggestion_message="Please sort the POTFILES files alphabetically",
                 )
 
     @staticmethod
     def _get_files() -> List[str]:
         with open("po/POTFILES.in") as potfiles_file:
-            return [line.strip() for line in potfiles_file.readlines()]
+            return [line.strip() for line in potfiles_file]
 
 
 class PotfilesExist(Check):
@@ -213,15 +306,34 @@ class PotfilesExist(Check):
 
     @staticmethod
     def _get_non_existent_files() -> List[Path]:
-        files: List[Path] = []
+        potfiles: List[Path] = []
 
         with open("po/POTFILES.in") as potfiles_file:
-            for line in potfiles_file.readlines():
-                file = Path(line.strip())
-                if not file.exists():
-                    files.append(file)
+            for line in potfiles_file:
+                stripped_line = line.strip()
+                if stripped_line:
+                    potfiles.append(Path(stripped_line))
 
-        return files
+        # List each parent directory once instead of calling stat on every file.
+        # Only symlinks need a stat, so that dangling ones count as missing.
+        names_by_parent: Dict[Path, Set[str]] = {}
+
+        for parent in {potfile.parent for potfile in potfiles}:
+            try:
+                with os.scandir(parent) as entries:
+                    names_by_parent[parent] = {
+                        entry.name
+                        for entry in entries
+                        if entry.is_file() or entry.is_dir()
+                    }
+            except (FileNotFoundError, NotADirectoryError):
+                names_by_parent[parent] = set()
+
+        return [
+            potfile
+            for potfile in potfiles
+            if potfile.name not in names_by_parent[potfile.parent]
+        ]
 
 
 class PotfilesSanity(Check):
@@ -246,11 +358,16 @@ class PotfilesSanity(Check):
         potfiles = self._get_rust_or_ui_potfiles()
         files_with_translatable = self._get_ui_files() + self._get_rust_files()
 
+        potfiles_set = set(potfiles)
+        files_with_translatable_set = set(files_with_translatable)
+
         potfiles_without_translatable = [
-            potfile for potfile in potfiles if potfile not in files_with_translatable
+            potfile
+            for potfile in potfiles
+            if potfile not in files_with_translatable_set
         ]
         files_that_should_be_potfile = [
-            file for file in files_with_translatable if file not in potfiles
+            file for file in files_with_translatable if file not in potfiles_set
         ]
 
         n_potfiles_without_translatable = len(potfiles_without_translatable)
@@ -285,52 +402,22 @@ class PotfilesSanity(Check):
 
     @staticmethod
     def _get_rust_or_ui_potfiles() -> List[Path]:
-        potfiles: List[Path] = []
+        potfiles_by_suffix: Dict[str, List[Path]] = {".ui": [], ".rs": []}
 
         with open("po/POTFILES.in") as potfiles_file:
-            for line in potfiles_file.readlines():
+            for line in potfiles_file:
                 file = Path(line.strip())
+                potfiles_by_suffix.setdefault(file.suffix, []).append(file)
 
-                if file.suffix in [".ui", ".rs"]:
-                    potfiles.append(file)
-
-        return potfiles
+        return potfiles_by_suffix[".ui"] + potfiles_by_suffix[".rs"]
 
     @staticmethod
     def _get_ui_files() -> List[Path]:
-        output = get_output(
-            [
-                "find",
-                "data/resources/ui",
-                "-type",
-                "f",
-                "-exec",
-                "grep",
-                "-lI",
-                'translatable="yes"',
-                "{}",
-                ";",
-            ]
-        )
-        return [Path(line) for line in output.splitlines()]
+        return grep_files(Path("data/resources/ui"), ".ui", UI_TRANSLATABLE_PATTERN)
 
     @staticmethod
     def _get_rust_files() -> List[Path]:
-        output = get_output(
-            [
-                "find",
-                "src",
-                "-type",
-                "f",
-                "-exec",
-                "grep",
-                "-lIE",
-                r"gettext[!]?\(",
-                "{}",
-                ";",
-            ]
-        )
-        return [Path(line) for line in output.splitlines()]
+        return grep_files(Path("src"), ".rs", RUST_GETTEXT_PATTERN)
 
 
 class Resources(Check):
@@ -348,19 +435,21 @@ class Resources(Check):
         return "data/resources/resources.gresource.xml"
 
     def run(self):
-        tree = ElementTree.parse("data/resources/resources.gresource.xml")
-        gresource = tree.find("gresource")
-
-        if gresource is None:
-            return
-
-        files = [element.text for element in gresource.findall("file") if element.text]
-        sorted_files = sorted(files, key=lambda f: Path(f).with_suffix(""))
-
-        for file, sorted_file in zip(files, sorted_files):
-            if file != sorted_file:
+        # Pairs of file and its sort key, so each key is only computed once
+        files: List[Tuple[str, Path]] = []
+
+        for _, element in ElementTree.iterparse(
+            "data/resources/resources.gresource.xml", events=("end",)
+        ):
+            if element.tag == "file":
+                if element.text:
+                    files.append((element.text, Path(element.text).with_suffix("")))
+                element.clear()
+
+        for (file, key), (next_file, next_key) in zip(files, files[1:]):
+            if key > next_key:
                 raise FailedCheckError(
-                    error_message=f"{ERROR}: Found file `{file}` before `{sorted_file}` in resources.gresource.xml",
+                    error_message=f"{ERROR}: Found file `{file}` before `{next_file}` in resources.gresource.xml",
                     suggestion_message="Please sort the resources alphabetically",
                 )
 
@@ -436,24 +525,45 @@ class LeftoverDebugPrints(Check):
         return matches
 
 
+class IncompletePrerequisiteError(Exception):
+    pass
+
+
+class AbortedError(Exception):
+    pass
+
+
 class Runner:
-    """Runs the checks."""
+    """Runs the checks.
+
+    Checks are run concurrently, since most of them just wait on external tools.
+    A check with prerequisites waits for all of them to finish before running.
+    Results are still reported in the order the checks were added.
+
+    With `fail_fast`, the remaining checks are aborted after the first failure.
+    """
 
     @dataclass
     class CheckItem:
         check: Check
         skip: bool
+        skip_reason: str
         prerequisites: List[Check]
 
-    _check_items: List[CheckItem] = []
-    _successful_checks: List[Check] = []
-    _failed_checks: List[Tuple[Check, CheckError]] = []
-
-    def __init__(self, verbose: bool = False):
+    def __init__(self, verbose: bool = False, fail_fast: bool = False):
         self._verbose = verbose
+        self._fail_fast = fail_fast
+        self._check_items: List[Runner.CheckItem] = []
+        self._failed_checks: List[Tuple[Check, CheckError]] = []
 
-    def add(self, check: Check, skip: bool = False, prerequisites: List[Check] = []):
-        check_item = Runner.CheckItem(check, skip, prerequisites)
+    def add(
+        self,
+        check: Check,
+        skip: bool = False,
+        prerequisites: List[Check] = [],
+        skip_reason: str = "via command flag",
+    ):
+        check_item = Runner.CheckItem(check, skip, skip_reason, prerequisites)
         self._check_items.append(check_item)
 
     def run_all(self) -> bool:
@@ -465,31 +575,70 @@ class Runner:
         print("")
         print(f"running {n_checks} checks")
 
+        n_successful = 0
         n_skipped = 0
         start_time = time.time()
 
-        for item in self._check_items:
-            if item.skip:
-                n_skipped += 1
-                self._print_result(item.check, f"{SKIPPED} (via command flag)")
-                continue
+        futures: Dict[Check, Future[None]] = {}
 
-            if not self._has_complete_prerequisite(item):
-                n_skipped += 1
-                self._print_has_incomplete_prerequisite(item)
-                continue
+        # The abort state is module-wide, so it may be left over from an earlier run
+        _abort_event.clear()
 
-            try:
-                item.check.run()
-            except CheckError as e:
-                self._failed_checks.append((item.check, e))
-                self._print_result(item.check, FAILED)
-            else:
-                self._successful_checks.append(item.check)
-                self._print_result(item.check, OK)
+        executor = ThreadPoolExecutor(max_workers=max(n_checks, 1))
+
+        try:
+            for item in self._check_items:
+                if item.skip:
+                    continue
+
+                # Prerequisites are added before the checks that depend on them,
+                # so their futures are already available at this point.
+                future = executor.submit(self._run_item, item, futures)
+
+                if self._fail_fast:
+                    future.add_done_callback(
+                        lambda future: self._abort_on_failure(future, futures)
+                    )
+
+                futures[item.check] = future
+
+            # Results are reported in the order the checks were added, while
+            # the checks themselves still run concurrently.
+            for item in self._check_items:
+                if item.skip:
+                    n_skipped += 1
+                    self._print_result(item.check, f"{SKIPPED} ({item.skip_reason})")
+                    continue
+
+                try:
+                    futures[item.check].result()
+                except (AbortedError, CancelledError):
+                    n_skipped += 1
+                    self._print_result(
+                        item.check, f"{SKIPPED} (aborted by --fail-fast)"
+                    )
+                except IncompletePrerequisiteError:
+                    n_skipped += 1
+                    self._print_has_incomplete_prerequisite(item, futures)
+                except CheckError as e:
+                    self._failed_checks.append((item.check, e))
+                    self._print_result(item.check, FAILED)
+                else:
+                    n_successful += 1
+                    self._print_result(item.check, OK)
+        except KeyboardInterrupt:
+            # The processes are in their own process groups, so they don't get
+            # the SIGINT from the terminal
+            abort_running_processes(signal.SIGINT)
+
+            for future in list(futures.values()):
+                future.cancel()
+
+            raise
+        finally:
+            executor.shutdown()
 
         check_duration = time.time() - start_time
-        n_successful_checks = len(self._successful_checks)
         n_failed = len(self._failed_checks)
 
         if n_failed > 0:
@@ -498,22 +647,48 @@ class Runner:
 
         print("")
         self._print_final_result(
-            n_checks, n_successful_checks, n_failed, n_skipped, check_duration
+            n_checks, n_successful, n_failed, n_skipped, check_duration
         )
 
         return n_failed == 0
 
-    def _has_complete_prerequisite(self, item: CheckItem) -> bool:
+    def _run_item(self, item: CheckItem, futures: Dict[Check, Future[None]]):
+        has_complete_prerequisite = self._has_complete_prerequisite(item, futures)
+
+        if _abort_event.is_set():
+            raise AbortedError
+
+        if not has_complete_prerequisite:
+            raise IncompletePrerequisiteError
+
+        item.check.run()
+
+    @staticmethod
+    def _abort_on_failure(future: Future[None], futures: Dict[Check, Future[None]]):
+        if future.cancelled() or not isinstance(future.exception(), CheckError):
+            return
+
+        abort_running_processes()
+
+        # Checks that have not started yet are not run at all
+        for other_future in list(futures.values()):
+            other_future.cancel()
+
+    def _has_complete_prerequisite(
+        self, item: CheckItem, futures: Dict[Check, Future[None]]
+    ) -> bool:
         for prerequisite_check in item.prerequisites:
-            if prerequisite_check not in self._successful_checks:
+            if not self._is_successful(prerequisite_check, futures):
                 return False
         return True
 
-    def _print_has_incomplete_prerequisite(self, item: CheckItem):
+    def _print_has_incomplete_prerequisite(
+        self, item: CheckItem, futures: Dict[Check, Future[None]]
+    ):
         prerequisites_to_print = [
             prerequisite.subject()
             for prerequisite in item.prerequisites
-            if prerequisite not in self._successful_checks
+            if not self._is_successful(prerequisite, futures)
         ]
 
         requires_message = ", ".join(prerequisites_to_print)
@@ -523,6 +698,14 @@ class Runner:
             f"{SKIPPED} (requires: {requires_message})",
         )
 
+    @staticmethod
+    def _is_successful(check: Check, futures: Dict[Check, Future[None]]) -> bool:
+        future = futures.get(check)
+        # Waits for the check to finish if it is still running
+        return (
+            future is not None and not future.cancelled() and future.exception() is None
+        )
+
     def _print_failures(self):
         print("failures:")
         print("")
@@ -551,7 +734,15 @@ class Runner:
     def _print_result(self, check: Check, remark: str):
         messages = ["check", check.subject()]
 
-        version = check.version() if self._verbose else None
+        version = None
+        if self._verbose:
+            try:
+                version = check.version()
+            except AbortedError:
+                # No new processes can be started to probe the version after
+                # aborting, which can happen while the probe is running too
+                pass
+
         if version is not None:
             messages.append(f"({version})")
 
@@ -571,30 +762,199 @@ class Runner:
         )
 
 
+@contextmanager
+def spawn(
+    args: List[str], stderr: int = subprocess.PIPE
+) -> Iterator[subprocess.Popen[str]]:
+    """Starts a process that is terminated by `abort_running_processes`.
+
+    Pass `subprocess.STDOUT` as `stderr` to read both outputs from stdout.
+
+    Raises `AbortedError` if the checks were aborted before the process is
+    started or while it is running.
+    """
+
+    with _running_processes_lock:
+        if _abort_event.is_set():
+            raise AbortedError
+
+        process = subprocess.Popen(
+            args,
+            # Reading from the terminal would stop a process in another group
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            env=_ENV,
+            encoding="utf-8",
+            errors="replace",
+            **_PROCESS_GROUP_ARGS,
+        )
+        _running_processes.add(process)
+
+    try:
+        with process:
+            yield process
+    finally:
+        with _running_processes_lock:
+            _running_processes.discard(process)
+
+    # The process may have been terminated, so its output can't be trusted
+    if _abort_event.is_set():
+        raise AbortedError
+
+
+def abort_running_processes(signal_number: int = signal.SIGTERM):
+    """Signals the running processes and prevents new ones from starting."""
+
+    with _running_processes_lock:
+        _abort_event.set()
+
+        for process in _running_processes:
+            try:
+                os.killpg(process.pid, signal_number)
+            except ProcessLookupError:
+                pass
+
+
 def run_and_get_output(args: List[str]) -> Tuple[int, str]:
-    process = subprocess.run(args, capture_output=True)
-    stdout = process.stdout.decode("utf-8").strip()
-    stderr = process.stderr.decode("utf-8").strip()
-    return (process.returncode, "\n".join([stdout, stderr]).strip())
+    with spawn(args) as process:
+        stdout, stderr = process.communicate()
+
+    return (process.returncode, "\n".join([stdout.strip(), stderr.strip()]).strip())
 
 
 def get_output(args: List[str]) -> str:
-    process = subprocess.run(args, capture_output=True, check=True)
-    return process.stdout.decode("utf-8").strip()
+    with spawn(args) as process:
+        stdout, stderr = process.communicate()
+
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, args, stdout, stderr)
+
+    return stdout.strip()
+
+
+def get_staged_files() -> List[Path]:
+    """Returns the added, copied, modified, or renamed files in the git index."""
+
+    output = get_output(
+        ["git", "diff", "--cached", "--name-only", "--diff-filter=ACMR", "-z"]
+    )
+    return [Path(name) for name in output.split("\0") if name]
+
+
+def get_staged_paths() -> List[Path]:
+    """Returns every path touched by the changes in the git index.
+
+    Unlike `get_staged_files`, this includes deleted files and the old paths
+    of renamed files.
+    """
+
+    output = get_output(
+        ["git", "diff", "--cached", "--name-status", "--diff-filter=ACDMR", "-z"]
+    )
+    fields = [field for field in output.split("\0") if field]
+    paths: List[Path] = []
+
+    index = 0
+    while index < len(fields):
+        status = fields[index]
+        # Copies and renames are followed by both the old and the new path
+        n_paths = 2 if status[0] in "CR" else 1
+        paths.extend(Path(name) for name in fields[index + 1 : index + 1 + n_paths])
+        index += 1 + n_paths
+
+    return paths
+
+
+def get_potfiles() -> Set[Path]:
+    with open("po/POTFILES.in") as potfiles_file:
+        return {Path(line.strip()) for line in potfiles_file if line.strip()}
+
+
+def grep_files(root: Path, suffix: str, pattern: re.Pattern[bytes]) -> List[Path]:
+    """Returns the files under `root` ending with `suffix` that match `pattern`."""
+
+    files: List[Path] = []
+
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            if not file_name.endswith(suffix):
+                continue
+
+            path = Path(dir_path, file_name)
+            path_stat = os.lstat(path)
+
+            # Like `find -type f`, skip symlinks and other non-regular files, such
+            # as dangling editor lock files. Empty files can't be mapped either.
+            if not stat.S_ISREG(path_stat.st_mode) or path_stat.st_size == 0:
+                continue
+
+            with open(path, "rb") as file, mmap.mmap(
+                file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as content:
+                if pattern.search(content) is not None:
+                    files.append(path)
+
+    return files
 
 
 def main(args: Optional[Namespace]) -> int:
-    runner = Runner(verbose=args.verbose if args else False)
-    runner.add(Rustfmt(), skip=args.skip_rustfmt if args else False)
-    runner.add(Typos(), skip=args.skip_typos if args else False)
+    runner = Runner(
+        verbose=args.verbose if args else False,
+        fail_fast=args.fail_fast if args else False,
+    )
+
+    staged_files = get_staged_files() if args and args.staged_only else None
+    staged_rust_files = None
+    has_staged_potfiles = True
+
+    if staged_files is not None:
+        staged_rust_files = [file for file in staged_files if file.suffix == ".rs"]
+
+        # Deleting or renaming a listed file also affects the POTFILES checks
+        potfiles = get_potfiles()
+        has_staged_potfiles = any(
+            path.suffix in [".ui", ".rs"]
+            or path == Path("po/POTFILES.in")
+            or path in potfiles
+            for path in get_staged_paths()
+        )
+
+    skip_rustfmt = args.skip_rustfmt if args else False
+    runner.add(
+        Rustfmt(
+            files=staged_rust_files,
+            stop_at_first_diff=args.fail_fast if args else False,
+        ),
+        skip=skip_rustfmt or staged_rust_files == [],
+        skip_reason="via command flag" if skip_rustfmt else "no staged files",
+    )
+
+    skip_typos = args.skip_typos if args else False
+    runner.add(
+        Typos(files=staged_files),
+        skip=skip_typos or staged_files == [],
+        skip_reason="via command flag" if skip_typos else "no staged files",
+    )
 
     potfiles_exist = PotfilesExist()
     potfiles_sanity = PotfilesSanity()
-    runner.add(potfiles_exist)
-    runner.add(potfiles_sanity, prerequisites=[potfiles_exist])
+    runner.add(
+        potfiles_exist,
+        skip=not has_staged_potfiles,
+        skip_reason="no staged files",
+    )
+    runner.add(
+        potfiles_sanity,
+        skip=not has_staged_potfiles,
+        prerequisites=[potfiles_exist],
+        skip_reason="no staged files",
+    )
     runner.add(
         PotfilesAlphabetically(),
+        skip=not has_staged_potfiles,
         prerequisites=[potfiles_exist, potfiles_sanity],
+        skip_reason="no staged files",
     )
 
     runner.add(Resources())
@@ -606,7 +966,7 @@ def main(args: Optional[Namespace]) -> int:
         return 1
 
 
-def parse_args() -> Namespace:
+def parse_args(args: Optional[List[str]] = None) -> Namespace:
     from argparse import ArgumentParser
 
     parser = ArgumentParser(
@@ -624,8 +984,20 @@ def parse_args() -> Namespace:
     parser.add_argument(
         "-st", "--skip-typos", action="store_true", help="Whether to skip running typos"
     )
+    parser.add_argument(
+        "-ff",
+        "--fail-fast",
+        action="store_true",
+        help="Whether to abort the remaining checks after the first failure",
+    )
+    parser.add_argument(
+        "-so",
+        "--staged-only",
+        action="store_true",
+        help="Whether to only check the files staged for commit",
+    )
 
-    return parser.parse_args()
+    return parser.parse_args(args)
 
 
 if __name__ == "__main__":